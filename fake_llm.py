@@ -0,0 +1,137 @@
+"""
+Scripted stand-in for the Groq client that emits malformed output, plus a runnable
+check of llm_structured.request_structured against it.
+
+    python fake_llm.py        # exits 1 if any scenario fails
+"""
+import json
+import sys
+from types import SimpleNamespace
+
+from llm_structured import NEWSLETTER_SCHEMA, request_structured
+
+BODY = (
+    "<p>Welcome to today's issue of The Vector Daily.</p>"
+    "<p><b>Agents Get Memory</b></p><p>A new agent framework keeps long-term memory across sessions.</p>"
+    "<p><i>To read the full article → <a href='https://example.com/a'>Click here</a></i></p>"
+)
+
+
+class FakeAPIError(Exception):
+    """Shaped like groq.APIStatusError: the parsed JSON error body is on `.body`."""
+
+    def __init__(self, message, failed_generation=None):
+        super().__init__(message)
+        self.body = {"error": {"message": message, "code": "json_validate_failed"}}
+        if failed_generation is not None:
+            self.body["error"]["failed_generation"] = failed_generation
+
+
+class FakeLLMClient:
+    """
+    Answers chat.completions.create() with scripted outputs, one per call.
+    An output is a string, or a (text, error) pair: the text is streamed and then the
+    error is raised mid-stream (or right away for non-streamed calls).
+    """
+
+    def __init__(self, outputs, chunk_size=7):
+        self.outputs = list(outputs)
+        self.chunk_size = chunk_size
+        self.calls = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        output = self.outputs.pop(0) if self.outputs else ""
+        text, error = output if isinstance(output, tuple) else (output, None)
+
+        if not kwargs.get("stream"):
+            if error:
+                raise error
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+        def chunks():
+            for i in range(0, len(text), self.chunk_size):
+                delta = SimpleNamespace(content=text[i:i + self.chunk_size])
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+            if error:
+                raise error
+
+        return chunks()
+
+
+# --------------------------- SCENARIOS ---------------------------
+def _newsletter(subject="AI Agents Learn To Remember", body=BODY):
+    return json.dumps({"subject": subject, "newsletter_body": body})
+
+
+def scenario_fenced():
+    client = FakeLLMClient(["Sure! ```json\n" + _newsletter() + "\n```"])
+    # Groq can't stream in JSON mode, so the streamed call must not ask for it
+    return client, (lambda data, problems: not problems and data["newsletter_body"] == BODY
+                    and "response_format" not in client.calls[0])
+
+
+def scenario_brace_in_prose():
+    client = FakeLLMClient(["Here is the newsletter {as requested}: " + _newsletter()])
+    return client, (lambda data, problems: not problems and data["newsletter_body"] == BODY
+                    and len(client.calls) == 1)
+
+
+def scenario_truncated():
+    full = _newsletter()
+    cut = full.index("Click here")
+    client = FakeLLMClient([full[:cut], json.dumps({"continuation": BODY[BODY.index("Click here"):]})])
+    return client, (lambda data, problems: not problems and data["newsletter_body"].endswith("</a></i></p>")
+                    and client.calls[1]["max_tokens"] < 1800)
+
+
+def scenario_invalid_field():
+    client = FakeLLMClient([
+        '{"subject": , "newsletter_body": ' + json.dumps(BODY) + "}",
+        json.dumps({"subject": "Agents Learn To Remember Things"}),
+    ])
+    return client, (lambda data, problems: not problems and data["subject"].startswith("Agents")
+                    and client.calls[1]["max_tokens"] == NEWSLETTER_SCHEMA["subject"].max_tokens
+                    and client.calls[1]["response_format"] == {"type": "json_object"})
+
+
+def scenario_mid_stream_error():
+    full = _newsletter()
+    cut = full.index('"newsletter_body"')
+    client = FakeLLMClient([
+        (full[:cut], FakeAPIError("connection reset")),
+        json.dumps({"newsletter_body": BODY}),
+    ])
+    return client, (lambda data, problems: not problems and data["subject"] == "AI Agents Learn To Remember"
+                    and len(client.calls) == 2)
+
+
+def scenario_failed_generation():
+    bad = _newsletter(subject="")  # parses, but the subject fails validation
+    client = FakeLLMClient([
+        ("", FakeAPIError("Failed to validate JSON", failed_generation=bad)),
+        json.dumps({"subject": "Agents Learn To Remember Things"}),
+    ])
+    return client, (lambda data, problems: not problems and data["newsletter_body"] == BODY
+                    and len(client.calls) == 2)
+
+
+SCENARIOS = [scenario_fenced, scenario_brace_in_prose, scenario_truncated, scenario_invalid_field,
+             scenario_mid_stream_error, scenario_failed_generation]
+
+
+def main():
+    failures = 0
+    for scenario in SCENARIOS:
+        client, check = scenario()
+        data, problems = request_structured(client, "fake-model", "Output valid JSON.",
+                                            NEWSLETTER_SCHEMA, max_tokens=1800)
+        ok = check(data, problems)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {scenario.__name__[9:]}: {len(client.calls)} calls, problems={problems}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Minimal SMTP sink for testing sends locally. Accepts every message and counts it.
+
+    python fake_smtp.py --port 1025 [--save-dir data/outbox]
+    SMTP_SERVER=localhost SMTP_PORT=1025 SMTP_USE_TLS=0 API_BASE_URL=http://localhost:8000 \
+        python send_newsletter.py --workers 4
+"""
+import argparse
+import os
+import socketserver
+import threading
+import time
+
+
+class SinkStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.messages = 0
+        self.recipients = 0
+        self.bytes = 0
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self.reply("220 fake-smtp ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip()
+            verb = command[:4].upper()
+
+            if verb == "EHLO":
+                self.wfile.write(b"250-fake-smtp\r\n250 8BITMIME\r\n")
+            elif verb in ("HELO", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip(" <>"))
+                self.reply("250 OK")
+            elif verb == "RSET":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                chunks = []
+                for data_line in self.rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    chunks.append(data_line)
+                self.server.store(recipients, b"".join(chunks))
+                self.reply("250 OK queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, save_dir=None):
+        super().__init__(address, SMTPSinkHandler)
+        self.stats = SinkStats()
+        self.save_dir = save_dir
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+
+    def store(self, recipients, message):
+        with self.stats.lock:
+            self.stats.messages += 1
+            self.stats.recipients += len(recipients)
+            self.stats.bytes += len(message)
+            number = self.stats.messages
+        if self.save_dir:
+            with open(os.path.join(self.save_dir, f"{number:07d}.eml"), "wb") as f:
+                f.write(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--save-dir", help="write each received message as an .eml file")
+    args = parser.parse_args()
+
+    sink = SMTPSink((args.host, args.port), args.save_dir)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    print(f"📭 Fake SMTP sink listening on {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        last = -1
+        while True:
+            time.sleep(2)
+            if sink.stats.messages != last:
+                last = sink.stats.messages
+                print(f"   ➤ {sink.stats.messages} messages, {sink.stats.bytes / 1024:.0f} KiB received")
+    except KeyboardInterrupt:
+        sink.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,25 @@
-import json
 import os
 from dotenv import load_dotenv
-from groq import Groq
+
+import storage
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Groq client
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Groq client is created on first use, see get_client()
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        from groq import Groq
+        _client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    return _client
 
 # ---------------- CONFIG ----------------
-INPUT_JSON = "data/ai_news.json"
-OUTPUT_JSON = "data/ai_news_digest.json"
+INPUT_STEM = "data/ai_news"  # .json / .jsonl / .parquet, see storage.py
+OUTPUT_STEM = "data/ai_news_digest"
 MODEL = "llama-3.1-8b-instant"  # fast & free Groq model
 
 # ---------------- HELPER FUNCTION ----------------
@@ -36,7 +44,7 @@ Instructions:
 URL: {article['url']}
 """
     try:
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model=MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
@@ -50,11 +58,13 @@ URL: {article['url']}
 
 # ---------------- MAIN SCRIPT ----------------
 def main():
-    with open(INPUT_JSON, "r", encoding="utf-8") as f:
-        articles = json.load(f)
+    input_path = storage.find_intermediate(INPUT_STEM)
+    if input_path is None:
+        print(f"❌ No articles found at {INPUT_STEM}.*")
+        return
 
     digests = []
-    for article in articles:
+    for article in storage.iter_records(input_path):
         print(f"📝 Generating digest for: {article['title']}")
         digest_text = generate_digest(article)
         digests.append({
@@ -62,11 +72,10 @@ def main():
             "digest": digest_text
         })
 
-    os.makedirs("data", exist_ok=True)
-    with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-        json.dump(digests, f, ensure_ascii=False, indent=2)
+    output_path = storage.intermediate_path(OUTPUT_STEM)
+    storage.write_records(output_path, digests)
 
-    print(f"✅ Saved {len(digests)} digest articles to {OUTPUT_JSON}")
+    print(f"✅ Saved {len(digests)} digest articles to {output_path}")
 
 
 if __name__ == "__main__":
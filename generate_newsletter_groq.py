@@ -1,16 +1,33 @@
 import json
 import os
 import re
-from groq import Groq
+from datetime import date
 from dotenv import load_dotenv
 
+import storage
+from llm_structured import NEWSLETTER_SCHEMA, request_structured
+from newsletter_stream import NewsletterStreamer
+from newsletter_template import compile_template
+
 # ---------------- CONFIG ----------------
-INPUT_JSON = "data/ai_news_digest.json"
+INPUT_STEM = "data/ai_news_digest"  # .json / .jsonl / .parquet, see storage.py
 OUTPUT_JSON = "data/ai_newsletter.json"
+ISSUES_DIR = "data/issues"  # dated copies served by GET /newsletters/{date}
+PREVIEW_HTML = "data/vector_daily.preview.html"  # rewritten as sections stream in
+GENERATION_REPORT = "data/reports/generation.json"  # streamed sections + metrics, rewritten as they arrive
 MODEL = "llama-3.1-8b-instant"
 
 load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+_client = None
+
+
+def get_client():
+    """Groq client, created on first use so importing this module stays cheap."""
+    global _client
+    if _client is None:
+        from groq import Groq
+        _client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    return _client
 
 
 def extract_url_and_summary(digest_text):
@@ -29,35 +46,12 @@ def extract_url_and_summary(digest_text):
     return clean_text, url
 
 
-def sanitize_text(text: str) -> str:
-    """Cleans LLM output to make it JSON-safe."""
-    text = text.strip()
-    text = re.sub(r"```(?:json)?", "", text)
-    text = text.strip("` \n")
-    text = text.replace("\r", "")
-    text = re.sub(r"[\x00-\x1F\x7F]", "", text)  # remove control chars
-    return text
-
-
-def safe_parse_json(text: str):
-    """Tries to safely parse JSON output, falling back to plain text if invalid."""
-    text = sanitize_text(text)
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        match = re.search(r"\{[\s\S]+\}", text)
-        if match:
-            try:
-                return json.loads(match.group(0))
-            except Exception:
-                pass
-        return {
-            "subject": "AI Daily Newsletter",
-            "newsletter_body": f"<html><body><pre>{text}</pre></body></html>",
-        }
-
-
-def create_newsletter(digests):
+def create_newsletter(digests, preview_path=PREVIEW_HTML, on_section=None):
+    """
+    Returns (result, metrics). `result` is None if generation failed; `metrics` are the
+    NewsletterStreamer timings (None if the request never ran). `on_section` is called per
+    finished section while streaming, and with None if a repair replaced the body.
+    """
     # Extract title, clean digest, and URL properly
     structured_articles = []
     for d in digests:
@@ -108,29 +102,67 @@ Output valid JSON:
 }}
 """
 
+    streamer = NewsletterStreamer(
+        [a["url"] for a in structured_articles],
+        preview_path=preview_path, wrap=render_preview, on_section=on_section,
+    )
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=1800,
+        result, problems = request_structured(
+            get_client(), MODEL, prompt, NEWSLETTER_SCHEMA,
+            max_tokens=1800, temperature=0.7, parser=streamer.parser, on_text=streamer.feed,
         )
-
-        raw_output = response.choices[0].message.content.strip()
-        clean_output = sanitize_text(raw_output)
-        return safe_parse_json(clean_output)
-
     except Exception as e:
         print(f"❌ Error creating newsletter: {e}")
-        return None
+        return None, None
+
+    metrics = streamer.finish(result.get("newsletter_body"))
+    print(f"⏱️ First section after {metrics['time_to_first_section']}s • "
+          f"{metrics['tokens_per_second']} tokens/s • "
+          f"{metrics['article_sections']} article sections ({metrics['invalid_sections']} flagged)")
+
+    if problems:
+        # Don't ship a broken newsletter; only the failed fields were retried
+        print(f"❌ Newsletter output still invalid after repair: {problems}")
+        return None, metrics
+    return result, metrics
+
+
+def render_preview(body_html):
+    """Styled preview with the per-recipient slots filled, so its links aren't literal {{...}}."""
+    return compile_template(style_newsletter(body_html), inline=False).render_text({"unsubscribe_url": "#"})
+
+
+def write_generation_report(report, path=GENERATION_REPORT):
+    """Atomic rewrite, so a watcher never reads a half-written report."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
 
 
 def main():
-    with open(INPUT_JSON, "r", encoding="utf-8") as f:
-        digests = json.load(f)
+    input_path = storage.find_intermediate(INPUT_STEM)
+    if input_path is None:
+        print(f"❌ No digests found at {INPUT_STEM}.*")
+        return
+    digests = storage.read_records(input_path)
 
     print("🧠 Generating newsletter summary...")
-    result = create_newsletter(digests)
+    report = {"date": date.today().isoformat(), "status": "streaming", "sections": [], "metrics": None}
+
+    def on_section(section):
+        # Lets downstream jobs pick up finished sections before generation ends
+        if section is None:
+            report["sections"] = []
+        else:
+            report["sections"].append({k: section[k] for k in ("index", "title", "url", "problems")})
+        write_generation_report(report)
+
+    result, metrics = create_newsletter(digests, on_section=on_section)
+    report.update(status="done" if result else "failed", metrics=metrics)
+    write_generation_report(report)
+    print(f"📊 Generation report saved to {GENERATION_REPORT}")
 
     if result:
         result["newsletter_body"] = style_newsletter(result["newsletter_body"])
@@ -139,6 +171,12 @@ def main():
             json.dump(result, f, ensure_ascii=False, indent=2)
         print(f"✅ Newsletter generated and saved to {OUTPUT_JSON}")
 
+        os.makedirs(ISSUES_DIR, exist_ok=True)
+        issue_path = os.path.join(ISSUES_DIR, f"{date.today().isoformat()}.json")
+        with open(issue_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"🗂️ Issue archived to {issue_path}")
+
         with open("data/vector_daily.html", "w", encoding="utf-8") as f:
             f.write(result["newsletter_body"])
             print("🌐 Styled HTML preview saved to data/vector_daily.html")
@@ -275,7 +313,7 @@ def style_newsletter(html_content: str):
 
     <div class="footer">
       You’re receiving this email because you subscribed to <b>The Vector Daily</b>.<br>
-      <a href="#">Unsubscribe</a> • <a href="#">Privacy Policy</a>
+      <a href="{{{{unsubscribe_url}}}}">Unsubscribe</a> • <a href="#">Privacy Policy</a>
     </div>
   </div>
 </body>
@@ -0,0 +1,354 @@
+import json
+import re
+
+# ---------------- CONFIG ----------------
+CONTINUATION_MAX_TOKENS = 900
+MAX_REPAIRS_PER_FIELD = 2
+
+
+# --------------------------- SCHEMA ---------------------------
+class Field:
+    """One required top-level field of the expected JSON object."""
+
+    def __init__(self, description, max_tokens, check=None, type_=str):
+        self.description = description
+        self.max_tokens = max_tokens
+        self.check = check
+        self.type = type_
+
+    def problem(self, value):
+        """None if the value is acceptable, else a short reason (fed back to the model)."""
+        if not isinstance(value, self.type):
+            return f"not a {self.type.__name__}"
+        if self.check and not self.check(value):
+            return "empty or malformed"
+        return None
+
+
+def looks_like_html(value: str) -> bool:
+    return len(value.strip()) > 50 and re.search(r"<(p|b|h\d|a|div|br)\b", value, re.IGNORECASE) is not None
+
+
+NEWSLETTER_SCHEMA = {
+    "subject": Field("a 5–6 word professional subject line", 40,
+                     lambda v: 0 < len(v.strip()) <= 150),
+    "newsletter_body": Field("the newsletter body as an HTML string", 1800, looks_like_html),
+}
+
+
+def validate(data, schema):
+    """Returns {field: problem} for every missing or invalid field."""
+    problems = {}
+    for name, field in schema.items():
+        if name not in data:
+            problems[name] = "missing"
+        else:
+            problem = field.problem(data[name])
+            if problem:
+                problems[name] = problem
+    return problems
+
+
+# --------------------------- STREAMING PARSER ---------------------------
+class JSONObjectStream:
+    """
+    Incrementally parses one top-level JSON object as text arrives and reports each
+    top-level field the moment its value is complete. Leading prose or ``` fences are
+    skipped. If the stream stops mid-value, `partial()` returns what was received.
+    Top-level string values can also be consumed while they grow via `take_string_deltas()`.
+    """
+
+    def __init__(self, on_field=None):
+        self.on_field = on_field
+        self.text = ""
+        self.fields = {}
+        self.invalid = {}
+        self.done = False
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+        self._key_start = 0
+        self._value_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # Incremental decoding of the top-level string value being streamed
+        self._top_string = False
+        self._decoded_upto = 0
+        self._safe_end = 0
+        self._unicode_left = 0
+        self._high_surrogate = False
+        self._string_chunks = []
+
+    def feed(self, chunk: str):
+        self.text += chunk
+        text = self.text
+        i = self._pos
+        n = len(text)
+        while i < n and not self.done:
+            c = text[i]
+            state = self._state
+            if state == "start":
+                if c == "{":
+                    self._state = "open"
+            elif state == "open":
+                # Only a `{` followed by a key or `}` opens the object; braces in prose don't
+                if c == '"':
+                    self._state = "key"
+                    self._key_start = i
+                    self._escape = False
+                elif c == "}":
+                    self.done = True
+                elif not c.isspace():
+                    self._state = "start"
+                    continue
+            elif state == "key_or_end":
+                if c == '"':
+                    self._state = "key"
+                    self._key_start = i
+                    self._escape = False
+                elif c == "}":
+                    self.done = True
+            elif state == "key":
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._key = json.loads(text[self._key_start:i + 1], strict=False)
+                    self._state = "colon"
+            elif state == "colon":
+                if c == ":":
+                    self._state = "value"
+                    self._value_start = i + 1
+                    self._depth = 0
+                    self._in_string = False
+                    self._escape = False
+            else:  # value
+                if self._in_string:
+                    if self._unicode_left:
+                        self._unicode_left -= 1
+                        if not self._unicode_left:
+                            # A high surrogate needs its low half before it can be decoded
+                            self._high_surrogate = 0xD800 <= int(text[i - 3:i + 1], 16) <= 0xDBFF
+                            if not self._high_surrogate:
+                                self._safe_end = i + 1
+                    elif self._escape:
+                        self._escape = False
+                        if c == "u":
+                            self._unicode_left = 4
+                        else:
+                            self._safe_end = i + 1
+                    elif c == "\\":
+                        self._escape = True
+                    elif c == '"':
+                        self._in_string = False
+                        if self._top_string:
+                            self._string_chunks.append((self._key, text[self._decoded_upto:i]))
+                            self._top_string = False
+                    else:
+                        self._high_surrogate = False
+                        self._safe_end = i + 1
+                elif c == '"':
+                    self._in_string = True
+                    if self._depth == 0 and not text[self._value_start:i].strip():
+                        self._top_string = True
+                        self._decoded_upto = self._safe_end = i + 1
+                        self._unicode_left = 0
+                        self._high_surrogate = False
+                elif c in "{[":
+                    self._depth += 1
+                elif c in "]}" and self._depth:
+                    self._depth -= 1
+                elif c in ",}" and self._depth == 0:
+                    self._finish_value(text[self._value_start:i])
+                    if c == "}":
+                        self.done = True
+                    else:
+                        self._state = "key_or_end"
+            i += 1
+        self._pos = i
+        if self._top_string and self._safe_end > self._decoded_upto:
+            self._string_chunks.append((self._key, text[self._decoded_upto:self._safe_end]))
+            self._decoded_upto = self._safe_end
+
+    def take_string_deltas(self):
+        """
+        Decoded text added to top-level string values since the last call, as (key, text)
+        pairs. Only the new characters are decoded, so polling after every chunk stays linear.
+        """
+        chunks, self._string_chunks = self._string_chunks, []
+        return [(key, json.loads('"' + raw + '"', strict=False)) for key, raw in chunks if raw]
+
+    def _finish_value(self, raw):
+        try:
+            # strict=False: models often put raw newlines inside strings
+            value = json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            self.invalid[self._key] = raw.strip()
+            return
+        self.fields[self._key] = value
+        if self.on_field:
+            self.on_field(self._key, value)
+
+    def partial(self):
+        """(key, partial_string) if the stream ended inside a string value, else None."""
+        if self.done or self._state != "value":
+            return None
+        raw = self.text[self._value_start:].lstrip()
+        if not raw.startswith('"') or self._depth:
+            return None
+        raw = raw[:-1] if self._escape else raw
+        try:
+            return self._key, json.loads(raw + '"', strict=False)
+        except json.JSONDecodeError:
+            return None
+
+
+# --------------------------- REQUESTS ---------------------------
+def _complete(client, model, prompt, max_tokens, temperature, stream, on_text=None):
+    """
+    One chat completion; returns the full text (streamed if `stream`).
+    Groq's JSON mode doesn't support streaming, so only non-streamed calls use it;
+    streamed output is checked by JSONObjectStream instead.
+    """
+    kwargs = {} if stream else {"response_format": {"type": "json_object"}}
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=stream,
+        **kwargs,
+    )
+    if not stream:
+        return response.choices[0].message.content or ""
+
+    parts = []
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            if on_text:
+                on_text(delta)
+    return "".join(parts)
+
+
+def _continue_field(client, model, task_prompt, name, field, partial_value, temperature):
+    """Asks only for the rest of a value that was cut off (e.g. by max_tokens)."""
+    prompt = f"""{task_prompt}
+
+Your previous answer was cut off while writing "{name}" ({field.description}).
+It ended with:
+<<<
+{partial_value[-1500:]}
+>>>
+Continue exactly where it stops, without repeating any of it.
+Output valid JSON: {{"continuation": "..."}}"""
+    text = _complete(client, model, prompt, CONTINUATION_MAX_TOKENS, temperature, stream=False)
+    continuation = _parse_object(text).get("continuation")
+    return partial_value + continuation if isinstance(continuation, str) else None
+
+
+def _regenerate_field(client, model, task_prompt, name, field, problem, temperature):
+    """Asks for one missing/invalid field only, instead of the whole object."""
+    prompt = f"""{task_prompt}
+
+Your previous answer had a problem with "{name}": it was {problem}.
+Return ONLY that field — {field.description}.
+Output valid JSON: {{"{name}": ...}}"""
+    text = _complete(client, model, prompt, field.max_tokens, temperature, stream=False)
+    return _parse_object(text).get(name)
+
+
+def failed_generation(error):
+    """
+    The model's raw output attached to an API error, if any. Groq rejects JSON-mode
+    output that doesn't validate with a 400 `json_validate_failed` and puts the text
+    in error.failed_generation.
+    """
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        details = body.get("error", body)
+        if isinstance(details, dict) and isinstance(details.get("failed_generation"), str):
+            return details["failed_generation"]
+    return None
+
+
+def _parse_object(text):
+    stream = JSONObjectStream()
+    stream.feed(text)
+    return stream.fields
+
+
+def request_structured(client, model, prompt, schema, max_tokens, temperature=0.7,
+                       stream=True, on_field=None, on_text=None, parser=None):
+    """
+    Requests a JSON object, parsing it while it streams in. Fields that come back
+    missing, truncated or invalid — including after the request itself fails part-way —
+    are repaired with small follow-up calls for just that field.
+    Pass `parser` to read the stream as it is parsed (e.g. its string deltas in on_text).
+    Returns (data, problems); `problems` is empty when everything validated.
+    """
+    if parser is None:
+        parser = JSONObjectStream(on_field=on_field)
+    elif on_field:
+        parser.on_field = on_field
+
+    def feed(delta):
+        parser.feed(delta)
+        if on_text:
+            on_text(delta)
+
+    try:
+        text = _complete(client, model, prompt, max_tokens, temperature, stream, on_text=feed)
+        if not stream:
+            parser.feed(text)
+    except Exception as e:
+        # Keep whatever already arrived; the API may also hand back the rejected output
+        print(f"⚠️ Generation request failed ({e}); repairing from the partial output...")
+        rejected = failed_generation(e)
+        if rejected and len(rejected) > len(parser.text):
+            if rejected.startswith(parser.text):
+                parser.feed(rejected[len(parser.text):])
+            else:
+                parser = JSONObjectStream(on_field=on_field)
+                parser.feed(rejected)
+
+    data = dict(parser.fields)
+    problems = validate(data, schema)
+    truncated = parser.partial()
+    for name in problems:
+        if name in parser.invalid:
+            problems[name] = "not valid JSON"
+        elif truncated and truncated[0] == name:
+            problems[name] = "cut off"
+
+    for name in list(problems):
+        field = schema[name]
+        for _ in range(MAX_REPAIRS_PER_FIELD):
+            print(f"🔧 Repairing '{name}' ({problems[name]}) with a targeted request...")
+            try:
+                if truncated and truncated[0] == name:
+                    value = _continue_field(client, model, prompt, name, field, truncated[1], temperature)
+                    truncated = None
+                else:
+                    value = _regenerate_field(client, model, prompt, name, field, problems[name], temperature)
+            except Exception as e:
+                rejected = failed_generation(e)
+                value = _parse_object(rejected).get(name) if rejected else None
+                if value is None:
+                    print(f"❌ Repair request for '{name}' failed: {e}")
+                    break
+            problem = "missing" if value is None else field.problem(value)
+            if problem is None:
+                data[name] = value
+                del problems[name]
+                if on_field:
+                    on_field(name, value)
+                break
+            problems[name] = problem
+
+    return data, problems
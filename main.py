@@ -1,7 +1,6 @@
-import json
-import os
 from datetime import datetime, timezone
 
+import storage
 from scraper.scrape_utils import scrape_rss, scrape_article_full, scrape_arxiv_official
 from scraper.ai_sources import AI_SOURCES
 
@@ -18,6 +17,8 @@ def main():
             articles = scrape_arxiv_official(limit=2)
 
         print(f"   ➤ Found {len(articles)} raw articles")
+        for a in articles:
+            a["source"] = source["name"]
 
         # trending AI keywords
         trending_keywords = [
@@ -40,10 +41,8 @@ def main():
     ranked_articles = rank_articles(all_articles)
 
     # Save output
-    os.makedirs("data", exist_ok=True)
-    output_path = os.path.join("data", "ai_news.json")
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(ranked_articles, f, ensure_ascii=False, indent=2)
+    output_path = storage.intermediate_path("data/ai_news")
+    storage.write_records(output_path, ranked_articles)
     print(f"✅ Saved {len(ranked_articles)} curated & ranked articles to {output_path}")
 
 
@@ -0,0 +1,230 @@
+# newsletter_api/archive.py
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import date
+
+import storage
+from .paths import ARTICLES_STEM, DATA_DIR, DIGESTS_STEM, ISSUES_DIR, NEWSLETTER_PATH
+
+ARCHIVE_DB_PATH = os.getenv("ARCHIVE_DB_PATH", os.path.join(DATA_DIR, "archive.db"))
+KINDS = ("article", "digest", "issue")
+
+
+def get_conn():
+    """Helper: get a new archive DB connection."""
+    conn = sqlite3.connect(ARCHIVE_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    return conn
+
+
+# ======================================================
+# INIT
+# ======================================================
+def init_archive():
+    """Create archive tables, indexes and the FTS5 search index if missing."""
+    conn = get_conn()
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY,
+            run_date TEXT NOT NULL,
+            source TEXT,
+            url TEXT,
+            title TEXT NOT NULL,
+            summary TEXT,
+            image TEXT,
+            published_date TEXT,
+            UNIQUE (run_date, url, title)
+        );
+        CREATE INDEX IF NOT EXISTS idx_articles_run_date ON articles (run_date);
+        CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source);
+        CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url);
+
+        CREATE TABLE IF NOT EXISTS digests (
+            id INTEGER PRIMARY KEY,
+            run_date TEXT NOT NULL,
+            url TEXT,
+            title TEXT NOT NULL,
+            digest TEXT,
+            UNIQUE (run_date, title)
+        );
+        CREATE INDEX IF NOT EXISTS idx_digests_run_date ON digests (run_date);
+        CREATE INDEX IF NOT EXISTS idx_digests_url ON digests (url);
+
+        CREATE TABLE IF NOT EXISTS issues (
+            id INTEGER PRIMARY KEY,
+            run_date TEXT UNIQUE NOT NULL,
+            subject TEXT,
+            body_html TEXT
+        );
+
+        -- One search index over all three kinds; (kind, ref_id) points back at the source row
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title, body,
+            kind UNINDEXED, ref_id UNINDEXED, run_date UNINDEXED, url UNINDEXED,
+            tokenize = 'porter unicode61'
+        );
+    """)
+    conn.commit()
+    conn.close()
+
+
+# ======================================================
+# INGEST
+# ======================================================
+def _strip_html(html: str) -> str:
+    html = re.sub(r"<(style|script)[^>]*>[\s\S]*?</\1>", " ", html or "", flags=re.IGNORECASE)
+    return re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", html)).strip()
+
+
+def _digest_url(digest_text: str):
+    match = re.search(r"(https?://\S+)\s*$", digest_text.strip())
+    return match.group(1) if match else None
+
+
+def _index(cur, kind, ref_id, run_date, title, body, url=None):
+    cur.execute(
+        "INSERT INTO search_index (title, body, kind, ref_id, run_date, url) VALUES (?, ?, ?, ?, ?, ?);",
+        (title, body, kind, ref_id, run_date, url),
+    )
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def ingest_run(run_date: str = None, articles=None, digests=None, issue=None):
+    """
+    Append one pipeline run to the archive. Rows already archived for the same
+    run_date are skipped, so re-running ingestion is harmless.
+    Returns a dict of how many new rows were added per kind.
+    """
+    run_date = run_date or date.today().isoformat()
+    added = dict.fromkeys(KINDS, 0)
+
+    conn = get_conn()
+    cur = conn.cursor()
+    for a in articles or []:
+        cur.execute("""
+            INSERT OR IGNORE INTO articles (run_date, source, url, title, summary, image, published_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?);
+        """, (run_date, a.get("source"), a.get("url"), a.get("title", ""), a.get("summary"),
+              a.get("image"), a.get("published_date")))
+        if cur.rowcount:
+            _index(cur, "article", cur.lastrowid, run_date, a.get("title", ""), a.get("summary") or "", a.get("url"))
+            added["article"] += 1
+
+    for d in digests or []:
+        url = _digest_url(d.get("digest", ""))
+        cur.execute("""
+            INSERT OR IGNORE INTO digests (run_date, url, title, digest) VALUES (?, ?, ?, ?);
+        """, (run_date, url, d.get("title", ""), d.get("digest")))
+        if cur.rowcount:
+            _index(cur, "digest", cur.lastrowid, run_date, d.get("title", ""), d.get("digest") or "", url)
+            added["digest"] += 1
+
+    if issue:
+        cur.execute("""
+            INSERT OR IGNORE INTO issues (run_date, subject, body_html) VALUES (?, ?, ?);
+        """, (run_date, issue.get("subject"), issue.get("newsletter_body")))
+        if cur.rowcount:
+            _index(cur, "issue", cur.lastrowid, run_date, issue.get("subject") or "",
+                   _strip_html(issue.get("newsletter_body")))
+            added["issue"] += 1
+
+    conn.commit()
+    conn.close()
+    return added
+
+
+def _load_intermediate(stem):
+    path = storage.find_intermediate(stem)
+    return storage.iter_records(path) if path else None
+
+
+def ingest_current_files(run_date: str = None):
+    """Archive the latest data/ai_news.*, ai_news_digest.* and ai_newsletter.json."""
+    return ingest_run(
+        run_date,
+        articles=_load_intermediate(ARTICLES_STEM),
+        digests=_load_intermediate(DIGESTS_STEM),
+        issue=_load_json(NEWSLETTER_PATH),
+    )
+
+
+def backfill_issues():
+    """Archive every dated issue in data/issues/ (issues only; older runs kept no articles)."""
+    added = 0
+    if os.path.isdir(ISSUES_DIR):
+        for name in sorted(os.listdir(ISSUES_DIR)):
+            if name.endswith(".json"):
+                added += ingest_run(name[:-5], issue=_load_json(os.path.join(ISSUES_DIR, name)))["issue"]
+    return added
+
+
+# ======================================================
+# SEARCH
+# ======================================================
+def _fts_query(q: str) -> str:
+    """Turns free text into an FTS5 query of quoted terms (AND), so user input can't break the syntax."""
+    terms = re.findall(r"\w+", q, flags=re.UNICODE)
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def search(q: str, kind: str = None, source: str = None, date_from: str = None,
+           date_to: str = None, page: int = 1, page_size: int = 20):
+    """BM25-ranked full-text search over the archive. Title matches weigh more than body matches."""
+    match = _fts_query(q)
+    if not match:
+        return {"query": q, "total": 0, "page": page, "page_size": page_size, "results": []}
+
+    where = ["search_index MATCH ?"]
+    params = [match]
+    if kind:
+        where.append("kind = ?")
+        params.append(kind)
+    if date_from:
+        where.append("run_date >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("run_date <= ?")
+        params.append(date_to)
+    if source:
+        where.append("kind = 'article' AND ref_id IN (SELECT id FROM articles WHERE source = ?)")
+        params.append(source)
+    where_sql = " AND ".join(where)
+
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(f"SELECT COUNT(*) FROM search_index WHERE {where_sql};", params)
+    total = cur.fetchone()[0]
+    cur.execute(f"""
+        SELECT kind, ref_id, run_date, url, title,
+               snippet(search_index, 1, '<b>', '</b>', '…', 24) AS snippet,
+               bm25(search_index, 5.0, 1.0) AS score
+        FROM search_index
+        WHERE {where_sql}
+        ORDER BY score
+        LIMIT ? OFFSET ?;
+    """, params + [page_size, (page - 1) * page_size])
+    results = [dict(r) for r in cur.fetchall()]
+    conn.close()
+
+    return {"query": q, "total": total, "page": page, "page_size": page_size, "results": results}
+
+
+if __name__ == "__main__":
+    # python -m newsletter_api.archive [ingest [YYYY-MM-DD] | backfill]
+    init_archive()
+    command = sys.argv[1] if len(sys.argv) > 1 else "ingest"
+    if command == "backfill":
+        print(f"✅ Archived {backfill_issues()} past issues from {ISSUES_DIR}")
+    else:
+        added = ingest_current_files(sys.argv[2] if len(sys.argv) > 2 else None)
+        print(f"✅ Archived {added['article']} articles, {added['digest']} digests, {added['issue']} issues")
@@ -0,0 +1,223 @@
+# newsletter_api/content.py
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, Response
+
+import storage
+from newsletter_template import compile_template
+from .paths import ARTICLES_STEM, DIGESTS_STEM, HTML_PATH, ISSUES_DIR, NEWSLETTER_PATH
+
+# Public copies have no recipient, so the per-recipient unsubscribe slot gets a neutral link
+PUBLIC_UNSUBSCRIBE_URL = os.getenv("PUBLIC_UNSUBSCRIBE_URL", "#")
+
+# Files are re-stat'ed at most this often, so hot paths never touch disk
+CACHE_CHECK_INTERVAL = float(os.getenv("CACHE_CHECK_INTERVAL", 1.0))
+GZIP_MIN_SIZE = 500
+
+
+# ======================================================
+# CACHED ENTRY
+# ======================================================
+class CachedBody:
+    """A pre-encoded response body: raw + gzip bytes, ETag and Last-Modified."""
+
+    __slots__ = ("body", "gzipped", "etag", "last_modified", "mtime", "media_type")
+
+    def __init__(self, body: bytes, mtime: float, media_type: str):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.mtime = int(mtime)
+        self.media_type = media_type
+
+
+class CachedSource:
+    """
+    Keeps one source (a file or any other loader) in memory and reloads it
+    when its version changes. `version()` is only polled every CACHE_CHECK_INTERVAL.
+    """
+
+    def __init__(self, load, version, media_type="application/json"):
+        self._load = load
+        self._version = version
+        self.media_type = media_type
+        self._lock = threading.Lock()
+        self._entry = None
+        self._seen_version = None
+        self._checked_at = 0.0
+
+    def get(self) -> CachedBody:
+        now = time.monotonic()
+        if self._entry is not None and now - self._checked_at < CACHE_CHECK_INTERVAL:
+            return self._entry
+
+        with self._lock:
+            if self._entry is not None and now - self._checked_at < CACHE_CHECK_INTERVAL:
+                return self._entry
+            version = self._version()
+            if version is None:
+                self._entry = None
+                raise HTTPException(status_code=404, detail="Content not available yet")
+            if version != self._seen_version or self._entry is None:
+                body = self._load()
+                mtime = version[0] if isinstance(version, tuple) else time.time()
+                self._entry = CachedBody(body, mtime, self.media_type)
+                self._seen_version = version
+            self._checked_at = now
+            return self._entry
+
+
+def file_version(path):
+    """(mtime, size) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+def json_file_source(path, transform=None):
+    """Caches a JSON file re-serialized compactly (optionally transformed first)."""
+    def load():
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if transform:
+            data = transform(data)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return CachedSource(load, lambda: file_version(path))
+
+
+def intermediate_source(stem):
+    """Caches the newest pipeline intermediate for `stem`, whatever format it was written in."""
+    def version():
+        path = storage.find_intermediate(stem)
+        if path is None:
+            return None
+        # The pipeline may replace or remove the file between the lookup and the stat
+        version = file_version(path)
+        if version is None:
+            return None
+        return version + (path,)
+
+    def load():
+        path = storage.find_intermediate(stem)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Content not available yet")
+        records = list(storage.iter_records(path))
+        return json.dumps(records, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+    return CachedSource(load, version)
+
+
+def render_public(html: str) -> str:
+    """Fills the template slots (e.g. {{unsubscribe_url}}) for a copy served to anyone."""
+    return compile_template(html, inline=False).render_text({"unsubscribe_url": PUBLIC_UNSUBSCRIBE_URL})
+
+
+def _render_issue(issue):
+    if isinstance(issue, dict) and isinstance(issue.get("newsletter_body"), str):
+        issue = dict(issue, newsletter_body=render_public(issue["newsletter_body"]))
+    return issue
+
+
+def html_file_source(path):
+    def load():
+        with open(path, "r", encoding="utf-8") as f:
+            return render_public(f.read()).encode("utf-8")
+
+    return CachedSource(load, lambda: file_version(path), media_type="text/html; charset=utf-8")
+
+
+# ======================================================
+# RESPONSES
+# ======================================================
+def _not_modified(request: Request, entry: CachedBody) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return entry.etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(parsedate_to_datetime(if_modified_since).timestamp()) >= entry.mtime
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cached_response(request: Request, entry: CachedBody) -> Response:
+    """Serves a cached body with validators, answering 304 and gzip where possible."""
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": entry.last_modified,
+        "Cache-Control": "public, max-age=60",
+        "Vary": "Accept-Encoding",
+    }
+    if _not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+
+    if entry.gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=entry.gzipped, media_type=entry.media_type, headers=headers)
+    return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+
+# ======================================================
+# SOURCES
+# ======================================================
+latest_newsletter = json_file_source(NEWSLETTER_PATH, transform=_render_issue)
+latest_html = html_file_source(HTML_PATH)
+articles = intermediate_source(ARTICLES_STEM)
+digests = intermediate_source(DIGESTS_STEM)
+
+
+def _issues_version():
+    try:
+        st = os.stat(ISSUES_DIR)
+    except FileNotFoundError:
+        return (0.0, 0)
+    return (st.st_mtime, st.st_nlink)
+
+
+_issue_dates = frozenset()
+_issue_sources = {}
+
+
+def _load_issue_index():
+    global _issue_dates
+    dates = []
+    if os.path.isdir(ISSUES_DIR):
+        dates = sorted((f[:-5] for f in os.listdir(ISSUES_DIR) if f.endswith(".json")), reverse=True)
+    _issue_dates = frozenset(dates)
+    # Drop cached issues that were removed from disk
+    for date in list(_issue_sources):
+        if date not in _issue_dates:
+            _issue_sources.pop(date, None)
+    return json.dumps({"issues": dates}, separators=(",", ":")).encode("utf-8")
+
+
+issue_index = CachedSource(_load_issue_index, _issues_version)
+
+
+def issue(date: str) -> CachedSource:
+    """
+    Cached source for one archived issue (data/issues/YYYY-MM-DD.json).
+    Only dates in the issue index get a cache entry, so unknown dates can't grow memory.
+    """
+    issue_index.get()  # refreshes _issue_dates
+    if date not in _issue_dates:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    source = _issue_sources.get(date)
+    if source is None:
+        source = _issue_sources.setdefault(
+            date, json_file_source(os.path.join(ISSUES_DIR, f"{date}.json"), transform=_render_issue)
+        )
+    return source
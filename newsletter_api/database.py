@@ -1,7 +1,5 @@
 # newsletter_api/database.py
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,7 +7,10 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 def get_conn():
-    """Helper: get a new DB connection."""
+    """Helper: get a new DB connection. psycopg2 is imported on first use to keep startup fast."""
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
     return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
 
 
@@ -81,3 +82,33 @@ def get_all_subscribers():
     rows = [r["email"] for r in cur.fetchall()]
     conn.close()
     return rows
+
+# ======================================================
+# SHARDED FETCH (send_newsletter --workers / --shard)
+# ======================================================
+def get_subscriber_id_bounds():
+    """Return (min_id, max_id) of the subscribers table, or None if it is empty."""
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT MIN(id) AS lo, MAX(id) AS hi FROM subscribers;")
+    row = cur.fetchone()
+    conn.close()
+    if row["lo"] is None:
+        return None
+    return row["lo"], row["hi"]
+
+
+def iter_subscribers_in_range(start_id: int, end_id: int, batch_size: int = 1000):
+    """Stream subscriber emails with start_id <= id < end_id using a server-side cursor."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor(name=f"subscribers_{start_id}_{end_id}")
+        cur.itersize = batch_size
+        cur.execute(
+            "SELECT email FROM subscribers WHERE id >= %s AND id < %s ORDER BY id;",
+            (start_id, end_id),
+        )
+        for r in cur:
+            yield r["email"]
+    finally:
+        conn.close()
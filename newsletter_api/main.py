@@ -1,9 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from typing import Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 import re
 
 from .database import init_db, add_subscriber, get_all_subscribers, remove_subscriber, is_subscribed
+from . import archive, content
+from .rate_limit import rate_limit
 
 app = FastAPI(title="Vector Daily Newsletter API")
 
@@ -20,6 +24,7 @@ app.add_middleware(
 @app.on_event("startup")
 def startup_event():
     init_db()
+    archive.init_archive()
 
 # -------- Email validation --------
 EMAIL_REGEX = r"^[\w\.-]+@[\w\.-]+\.\w+$"
@@ -89,6 +94,67 @@ def get_subscribers():
     subscribers = get_all_subscribers()
     return {"subscribers": subscribers}
 
+# =========================================================
+# Public read API (cached in memory, rate limited)
+# =========================================================
+ISSUE_DATE_REGEX = r"^\d{4}-\d{2}-\d{2}$"
+
+@app.get("/newsletter/latest", dependencies=[Depends(rate_limit)])
+def latest_newsletter(request: Request):
+    return content.cached_response(request, content.latest_newsletter.get())
+
+
+@app.get("/newsletter/latest.html", dependencies=[Depends(rate_limit)])
+def latest_newsletter_html(request: Request):
+    return content.cached_response(request, content.latest_html.get())
+
+
+@app.get("/newsletters", dependencies=[Depends(rate_limit)])
+def list_issues(request: Request):
+    return content.cached_response(request, content.issue_index.get())
+
+
+@app.get("/newsletters/{date}", dependencies=[Depends(rate_limit)])
+def get_issue(date: str, request: Request):
+    if not re.match(ISSUE_DATE_REGEX, date):
+        raise HTTPException(status_code=400, detail="Date must be YYYY-MM-DD")
+    return content.cached_response(request, content.issue(date).get())
+
+
+@app.get("/articles", dependencies=[Depends(rate_limit)])
+def get_articles(request: Request):
+    return content.cached_response(request, content.articles.get())
+
+
+@app.get("/digests", dependencies=[Depends(rate_limit)])
+def get_digests(request: Request):
+    return content.cached_response(request, content.digests.get())
+
+
+# =========================================================
+# GET /search (full-text search over the archive)
+# Example: /search?q=reinforcement+learning&kind=article&page=2
+# =========================================================
+@app.get("/search", dependencies=[Depends(rate_limit)])
+def search_archive(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[str] = None,
+    source: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+):
+    if kind and kind not in archive.KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(archive.KINDS)}")
+    for value in (date_from, date_to):
+        if value and not re.match(ISSUE_DATE_REGEX, value):
+            raise HTTPException(status_code=400, detail="Date must be YYYY-MM-DD")
+
+    return archive.search(q, kind=kind, source=source, date_from=date_from,
+                          date_to=date_to, page=page, page_size=page_size)
+
+
 # =========================================================
 # Root
 # =========================================================
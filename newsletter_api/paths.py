@@ -0,0 +1,12 @@
+# newsletter_api/paths.py
+# Data file locations shared by the web layer (content.py) and the archive CLI (archive.py).
+# Kept free of heavy imports so the pipeline's archive step doesn't load the web stack.
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+NEWSLETTER_PATH = os.path.join(DATA_DIR, "ai_newsletter.json")
+DIGESTS_STEM = os.path.join(DATA_DIR, "ai_news_digest")  # .json / .jsonl / .parquet, see storage.py
+ARTICLES_STEM = os.path.join(DATA_DIR, "ai_news")
+HTML_PATH = os.path.join(DATA_DIR, "vector_daily.html")
+ISSUES_DIR = os.path.join(DATA_DIR, "issues")
@@ -0,0 +1,54 @@
+# newsletter_api/rate_limit.py
+import os
+import threading
+import time
+
+from fastapi import HTTPException, Request
+
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", 50))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", 100))
+MAX_TRACKED_CLIENTS = 10_000
+
+
+class TokenBucketLimiter:
+    """Per-client token bucket: `rate` tokens/second refill, up to `burst` tokens."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # client -> (tokens, last_refill)
+        self._lock = threading.Lock()
+
+    def acquire(self, client: str) -> float:
+        """Takes one token. Returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[client] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._evict(now)
+            return 0.0 if allowed else (1 - tokens) / self.rate
+
+    def _evict(self, now):
+        """Drops clients whose bucket has refilled completely (they're indistinguishable from new)."""
+        full_after = self.burst / self.rate
+        for client, (_, last) in list(self._buckets.items()):
+            if now - last >= full_after:
+                del self._buckets[client]
+
+
+limiter = TokenBucketLimiter(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+
+
+def rate_limit(request: Request):
+    """FastAPI dependency for the public read endpoints."""
+    client = request.client.host if request.client else "unknown"
+    retry_after = limiter.acquire(client)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
@@ -0,0 +1,162 @@
+import os
+import quopri
+import uuid
+from html import escape
+from email import policy
+from email.header import Header
+from email.utils import formataddr, parseaddr
+from email.mime.image import MIMEImage
+
+CRLF = b"\r\n"
+
+
+def _qp(data: bytes) -> bytes:
+    """Quoted-printable encode with CRLF line endings."""
+    return quopri.encodestring(data).replace(b"\n", CRLF)
+
+
+def _header(name: str, value: str) -> bytes:
+    """Encodes a single header line, RFC 2047-encoding it if it isn't plain ASCII."""
+    try:
+        value.encode("ascii")
+    except UnicodeEncodeError:
+        value = Header(value, "utf-8", header_name=name).encode(linesep="\r\n")
+    return f"{name}: {value}".encode("ascii") + CRLF
+
+
+def _address_header(name: str, value: str) -> bytes:
+    """Encodes an address header; only the display name may be RFC 2047-encoded, never the address."""
+    display_name, address = parseaddr(value)
+    if not address:
+        display_name, address = "", value
+    # A non-ASCII mailbox can't be encoded-word'ed; it goes out as UTF-8 (SMTPUTF8)
+    return f"{name}: {formataddr((display_name, address), charset='utf-8')}".encode("utf-8") + CRLF
+
+
+class CampaignMessageBuilder:
+    """
+    Builds the raw bytes of each recipient's newsletter from parts encoded once per campaign.
+
+    Layout (same as the original MIMEMultipart path in send_newsletter.py):
+        multipart/related
+          multipart/alternative
+            text/html (quoted-printable)
+          image/png (base64, Content-ID: <logo>)
+
+    The HTML is quoted-printable, which can be concatenated at any point as long as each
+    piece ends in a soft line break ("=" CRLF). So every static template segment is encoded
+    once, and only the short per-recipient slot values are encoded at send time.
+    """
+
+    def __init__(self, template, sender: str, subject: str, logo_path: str = None):
+        self.template = template
+        self.sender = sender
+        boundary = uuid.uuid4().hex
+        self.related_boundary = f"related-{boundary}".encode("ascii")
+        self.alt_boundary = f"alt-{boundary}".encode("ascii")
+
+        # Headers shared by every message (To is the only per-recipient header)
+        self.common_headers = (
+            _address_header("From", sender or "")
+            + _header("Subject", subject)
+            + b"MIME-Version: 1.0" + CRLF
+            + b'Content-Type: multipart/related; boundary="' + self.related_boundary + b'"' + CRLF
+        )
+
+        self.body_head = (
+            CRLF
+            + b"--" + self.related_boundary + CRLF
+            + b'Content-Type: multipart/alternative; boundary="' + self.alt_boundary + b'"' + CRLF
+            + CRLF
+            + b"--" + self.alt_boundary + CRLF
+            + b'Content-Type: text/html; charset="utf-8"' + CRLF
+            + b"Content-Transfer-Encoding: quoted-printable" + CRLF
+            + CRLF
+        )
+
+        soft_break = b"=" + CRLF
+        self.encoded_segments = tuple(_qp(seg) + soft_break for seg in template.segments)
+
+        tail = CRLF + b"--" + self.alt_boundary + b"--" + CRLF
+        logo_part = self._encode_logo(logo_path)
+        if logo_part:
+            tail += CRLF + b"--" + self.related_boundary + CRLF + logo_part
+        tail += CRLF + b"--" + self.related_boundary + b"--" + CRLF
+        self.body_tail = tail
+
+    @staticmethod
+    def _encode_logo(logo_path):
+        """Base64-encodes the inline logo part (headers included) exactly once."""
+        if not logo_path or not os.path.exists(logo_path):
+            return None
+        with open(logo_path, "rb") as f:
+            logo = MIMEImage(f.read())
+        logo.add_header("Content-ID", "<logo>")
+        logo.add_header("Content-Disposition", "inline", filename="logo.jpg")
+        del logo["MIME-Version"]
+        return logo.as_bytes(policy=policy.SMTP)
+
+    def build(self, recipient_email: str, values: dict) -> bytes:
+        """Raw RFC 5322 message for one recipient, ready for smtplib's sendmail()."""
+        segments = self.encoded_segments
+        parts = [_address_header("To", recipient_email), self.common_headers, self.body_head, segments[0]]
+        for i, name in enumerate(self.template.slots, start=1):
+            value = escape(str(values.get(name, "")), quote=True).encode("utf-8")
+            parts.append(_qp(value))
+            parts.append(b"=" + CRLF)
+            parts.append(segments[i])
+        parts.append(self.body_tail)
+        return b"".join(parts)
+
+
+# --------------------------- BENCHMARK ---------------------------
+def benchmark(html_path="data/vector_daily.html", logo_path="data/logo.png", n=2000):
+    """Compares per-recipient build cost of the cached builder against the MIMEMultipart path."""
+    import time
+    import tracemalloc
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    from newsletter_template import compile_template, unsubscribe_url
+
+    with open(html_path, "r", encoding="utf-8") as f:
+        template = compile_template(f.read())
+    subject = "📰 The Vector Daily - AI Newsletter"
+    sender = "newsletter@example.com"
+    recipients = [f"user{i}@example.com" for i in range(n)]
+
+    def legacy(email):
+        html_content = template.render_text({"unsubscribe_url": unsubscribe_url("http://localhost", email)})
+        msg = MIMEMultipart("related")
+        msg["From"] = sender
+        msg["To"] = email
+        msg["Subject"] = subject
+        alt = MIMEMultipart("alternative")
+        msg.attach(alt)
+        alt.attach(MIMEText(html_content, "html"))
+        with open(logo_path, "rb") as f:
+            logo = MIMEImage(f.read())
+            logo.add_header("Content-ID", "<logo>")
+            logo.add_header("Content-Disposition", "inline", filename="logo.jpg")
+            msg.attach(logo)
+        return msg.as_bytes()
+
+    builder = CampaignMessageBuilder(template, sender, subject, logo_path)
+
+    def cached(email):
+        return builder.build(email, {"unsubscribe_url": unsubscribe_url("http://localhost", email)})
+
+    for name, fn in (("MIMEMultipart (legacy)", legacy), ("CampaignMessageBuilder", cached)):
+        start = time.perf_counter()
+        for email in recipients:
+            fn(email)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        fn(recipients[0])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<24} {elapsed / n * 1e6:9.1f} µs/message   {peak / 1024:8.1f} KiB peak per message")
+
+
+if __name__ == "__main__":
+    benchmark()
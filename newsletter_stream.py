@@ -0,0 +1,151 @@
+import os
+import re
+import time
+
+from llm_structured import JSONObjectStream
+
+# A new section starts at a heading or at a paragraph that opens with a bold title
+SECTION_START_REGEX = re.compile(r"(?=<h[23]\b)|(?=<p>\s*<b>)", re.IGNORECASE)
+TITLE_REGEX = re.compile(r"<(h[23]|b)\b[^>]*>([\s\S]*?)</\1>", re.IGNORECASE)
+HREF_REGEX = re.compile(r"""href\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+
+class NewsletterStreamer:
+    """
+    Watches the newsletter completion while it streams in: pass `parser` and `feed`
+    (as on_text) to request_structured, so the body is decoded once, incrementally.
+
+    Every time an article section of `newsletter_body` is complete it is validated
+    (its link must be one of the input article URLs), an optional preview HTML file
+    is rewritten with everything finished so far, and `on_section` is called so
+    downstream work can start before generation ends. If a repair replaces the body,
+    `on_section(None)` signals that every section received so far is discarded.
+    """
+
+    def __init__(self, expected_urls, preview_path=None, wrap=None, on_section=None,
+                 body_field="newsletter_body"):
+        self.expected_urls = {u for u in expected_urls if u}
+        self.preview_path = preview_path
+        self.wrap = wrap or (lambda html: html)
+        self.on_section = on_section
+        self.body_field = body_field
+        self.parser = JSONObjectStream()
+        self.sections = []
+        self.restarts = 0
+        self._consumed = []  # body text already split off, including whitespace between sections
+        self._pending = ""   # body text after the last emitted section, still growing
+        self.chunks = 0
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.first_section_at = None
+        self.finished_at = None
+
+    # ---------------- streaming ----------------
+    def feed(self, delta: str):
+        """on_text callback; runs after request_structured has fed `delta` to self.parser."""
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.chunks += 1
+        grew = False
+        for key, text in self.parser.take_string_deltas():
+            if key == self.body_field:
+                self._pending += text
+                grew = grew or ">" in text
+        # Sections can only close on a tag boundary, skip the split otherwise
+        if grew:
+            self._emit_sections(final=False)
+
+    def finish(self, body=None):
+        """
+        Flushes the last section(s) once the full body is known (e.g. after repairs).
+        A body that doesn't continue what was already emitted replaces it entirely.
+        """
+        if body is not None:
+            emitted = "".join(self._consumed)
+            if body.startswith(emitted):
+                self._pending = body[len(emitted):]
+            else:
+                self._restart(body)
+        self._emit_sections(final=True)
+        self.finished_at = time.perf_counter()
+        return self.metrics()
+
+    def _restart(self, body):
+        print(f"🔁 Body was regenerated; discarding {len(self.sections)} streamed section(s)")
+        self.restarts += 1
+        self.sections = []
+        self._consumed = []
+        self._pending = body
+        if self.preview_path:
+            self._write_preview("")
+        if self.on_section:
+            self.on_section(None)
+
+    # ---------------- sections ----------------
+    def _emit_sections(self, final):
+        # _pending always starts at a section boundary, so only the tail is re-split
+        parts = SECTION_START_REGEX.split(self._pending)
+        # The last part may still be growing unless the body is complete
+        complete = parts if final else parts[:-1]
+        self._pending = "" if final else parts[-1]
+        self._consumed.extend(complete)
+        new_sections = [p for p in complete if p.strip()]
+        if not new_sections:
+            return
+
+        for html in new_sections:
+            section = self._check_section(html, index=len(self.sections))
+            self.sections.append(section)
+            if section["url"] and self.first_section_at is None:
+                self.first_section_at = time.perf_counter()
+            if section["problems"]:
+                print(f"⚠️ Section {section['index']} ({section['title'] or 'untitled'}): "
+                      f"{'; '.join(section['problems'])}")
+            if self.on_section:
+                self.on_section(section)
+
+        if self.preview_path:
+            self._write_preview("".join(s["html"] for s in self.sections))
+
+    def _check_section(self, html, index):
+        title_match = TITLE_REGEX.search(html)
+        title = re.sub(r"<[^>]+>", "", title_match.group(2)).strip() if title_match else None
+        urls = HREF_REGEX.findall(html)
+        url = urls[0] if urls else None
+
+        problems = []
+        if url and self.expected_urls and url not in self.expected_urls:
+            problems.append(f"link {url} is not one of today's articles")
+        text = re.sub(r"<[^>]+>", " ", html)
+        if url and len(text.split()) < 25:
+            problems.append("summary is too short")
+        return {"index": index, "title": title, "url": url, "html": html, "problems": problems}
+
+    def _write_preview(self, body_html):
+        """Atomic rewrite, so a reader never sees a half-written file."""
+        os.makedirs(os.path.dirname(self.preview_path) or ".", exist_ok=True)
+        tmp_path = self.preview_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.wrap(body_html))
+        os.replace(tmp_path, self.preview_path)
+
+    # ---------------- metrics ----------------
+    def metrics(self):
+        end = self.finished_at or time.perf_counter()
+        streaming_seconds = end - (self.first_token_at or end)
+
+        def since_start(t):
+            return round(t - self.started, 3) if t else None
+
+        return {
+            "time_to_first_token": since_start(self.first_token_at),
+            "time_to_first_section": since_start(self.first_section_at),
+            "total_seconds": round(end - self.started, 3),
+            # Groq streams roughly one token per chunk
+            "tokens": self.chunks,
+            "tokens_per_second": round(self.chunks / streaming_seconds, 1) if streaming_seconds > 0 else None,
+            "sections": len(self.sections),
+            "article_sections": sum(1 for s in self.sections if s["url"]),
+            "invalid_sections": sum(1 for s in self.sections if s["problems"]),
+            "restarts": self.restarts,
+        }
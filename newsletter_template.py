@@ -0,0 +1,229 @@
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import quote
+
+# ---------------- CONFIG ----------------
+# Placeholders look like {{unsubscribe_url}} and are filled per recipient at send time.
+SLOT_REGEX = re.compile(r"\{\{\s*([a-z_][a-z0-9_]*)\s*\}\}")
+STYLE_REGEX = re.compile(r"<style[^>]*>([\s\S]*?)</style>", re.IGNORECASE)
+# tag, .class or tag.class — anything else (#id, >, *, [attr], :hover) stays in <style>
+SIMPLE_SELECTOR_REGEX = re.compile(r"^(?:[a-zA-Z][\w-]*)?(?:\.[\w-]+)*$")
+
+
+# --------------------------- CSS INLINING ---------------------------
+def _important(body: str) -> str:
+    """Declarations with !important, so they still beat the inlined base styles."""
+    declarations = []
+    for d in body.split(";"):
+        d = d.strip()
+        if d:
+            declarations.append(d if d.lower().endswith("!important") else f"{d} !important")
+    return " ".join(d + ";" for d in declarations)
+
+
+def _parse_css_rules(css: str):
+    """
+    Returns (rules, leftover_css).
+    rules: list of (selector_parts, declarations) for simple selectors we can inline
+    (tag, .class, tag.class and descendant chains of those).
+    leftover_css: everything else (@media blocks, pseudo-classes, #id, >, *, [attr]),
+    kept in <style> with !important so inline base styles don't override it.
+    """
+    css = re.sub(r"/\*[\s\S]*?\*/", "", css)
+    rules = []
+    leftover = []
+
+    # Pull out @media blocks first, they can't be inlined
+    pos = 0
+    plain = []
+    for m in re.finditer(r"@media[^{]+\{", css):
+        if m.start() < pos:
+            continue
+        depth = 1
+        i = m.end()
+        while i < len(css) and depth:
+            depth += {"{": 1, "}": -1}.get(css[i], 0)
+            i += 1
+        plain.append(css[pos:m.start()])
+        inner = "\n".join(
+            f"  {selectors.strip()} {{ {_important(body)} }}"
+            for selectors, body in re.findall(r"([^{}]+)\{([^{}]*)\}", css[m.end():i - 1])
+        )
+        leftover.append(f"{m.group(0).strip()}\n{inner}\n}}")
+        pos = i
+    plain.append(css[pos:])
+
+    for selectors, body in re.findall(r"([^{}]+)\{([^{}]*)\}", "".join(plain)):
+        declarations = " ".join(d.strip() + ";" for d in body.split(";") if d.strip())
+        for selector in selectors.split(","):
+            selector = selector.strip()
+            if not selector:
+                continue
+            parts = selector.split()
+            if not all(SIMPLE_SELECTOR_REGEX.match(p) for p in parts):
+                leftover.append(f"{selector} {{ {_important(body)} }}")
+                continue
+            rules.append((parts, declarations))
+    return rules, "\n".join(leftover)
+
+
+def _matches_simple(part, tag, classes):
+    name, _, cls = part.partition(".")
+    if name and name != tag:
+        return False
+    return not cls or all(c in classes for c in cls.split("."))
+
+
+def _specificity(parts):
+    """(classes, tags) — simple selectors have no ids, so this orders like CSS specificity."""
+    classes = sum(p.count(".") for p in parts)
+    tags = sum(1 for p in parts if p[:1].isalpha())
+    return classes, tags
+
+
+def _matches(parts, stack):
+    """Descendant-selector match against the open-element stack (last = current element)."""
+    tag, classes = stack[-1]
+    if not _matches_simple(parts[-1], tag, classes):
+        return False
+    i = len(stack) - 2
+    for part in reversed(parts[:-1]):
+        while i >= 0 and not _matches_simple(part, *stack[i]):
+            i -= 1
+        if i < 0:
+            return False
+        i -= 1
+    return True
+
+
+class _InlineStyler(HTMLParser):
+    """Records where each start tag lives and which style it should receive."""
+
+    VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+                 "link", "meta", "source", "track", "wbr"}
+
+    def __init__(self, rules):
+        super().__init__(convert_charrefs=False)
+        self.rules = rules
+        self.stack = []
+        self.edits = []
+
+    def handle_starttag(self, tag, attrs):
+        classes = set((dict(attrs).get("class") or "").split())
+        self.stack.append((tag, classes))
+        matched = [(parts, d) for parts, d in self.rules if _matches(parts, self.stack)]
+        # Later declarations win inline, so order by specificity (sort is stable: ties keep source order)
+        matched.sort(key=lambda rule: _specificity(rule[0]))
+        declarations = [d for _, d in matched]
+        if declarations:
+            self.edits.append((self.getpos(), self.get_starttag_text(), " ".join(declarations)))
+        if tag in self.VOID_TAGS:
+            self.stack.pop()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID_TAGS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                break
+
+
+def _with_style(tag_text: str, declarations: str) -> str:
+    """Merges declarations into a start tag; an existing inline style wins over the stylesheet."""
+    m = re.search(r"""\sstyle\s*=\s*(["'])(.*?)\1""", tag_text, re.IGNORECASE | re.DOTALL)
+    if m:
+        existing = m.group(2).strip()
+        if existing and not existing.endswith(";"):
+            existing += ";"
+        merged = f"{declarations} {existing}".strip()
+        return tag_text[:m.start()] + f' style="{merged}"' + tag_text[m.end():]
+    end = -2 if tag_text.endswith("/>") else -1
+    return tag_text[:end] + f' style="{declarations}"' + tag_text[end:]
+
+
+def inline_css(html: str) -> str:
+    """
+    Copies <style> rules onto matching elements as inline style attributes,
+    since many email clients strip <style> blocks. Rules that can't be inlined
+    (@media, :hover, ...) are kept in a reduced <style> block for clients that do support them.
+    """
+    style_match = STYLE_REGEX.search(html)
+    if not style_match:
+        return html
+
+    rules, leftover = _parse_css_rules(style_match.group(1))
+    styler = _InlineStyler(rules)
+    styler.feed(html)
+    styler.close()
+
+    line_offsets = [0]
+    for line in html.split("\n"):
+        line_offsets.append(line_offsets[-1] + len(line) + 1)
+
+    out = []
+    last = 0
+    for (line, col), tag_text, declarations in styler.edits:
+        start = line_offsets[line - 1] + col
+        out.append(html[last:start])
+        out.append(_with_style(tag_text, declarations))
+        last = start + len(tag_text)
+    out.append(html[last:])
+    inlined = "".join(out)
+
+    style_match = STYLE_REGEX.search(inlined)
+    replacement = f"<style>\n{leftover}\n</style>" if leftover else ""
+    return inlined[:style_match.start()] + replacement + inlined[style_match.end():]
+
+
+# --------------------------- TEMPLATE ---------------------------
+class CompiledTemplate:
+    """
+    A newsletter split into static UTF-8 byte segments and named slots.
+    len(segments) == len(slots) + 1, and render() interleaves them.
+    """
+
+    __slots__ = ("segments", "slots")
+
+    def __init__(self, segments, slots):
+        self.segments = segments
+        self.slots = slots
+
+    def render(self, values: dict) -> bytes:
+        """Splices per-recipient values into the static segments. Values are HTML-escaped."""
+        segments = self.segments
+        if not self.slots:
+            return segments[0]
+        parts = [segments[0]]
+        for i, name in enumerate(self.slots, start=1):
+            parts.append(escape(str(values.get(name, "")), quote=True).encode("utf-8"))
+            parts.append(segments[i])
+        return b"".join(parts)
+
+    def render_text(self, values: dict) -> str:
+        return self.render(values).decode("utf-8")
+
+
+def compile_template(html: str, inline: bool = True) -> CompiledTemplate:
+    """Compiles newsletter HTML once per campaign (CSS inlining included)."""
+    if inline:
+        html = inline_css(html)
+
+    segments = []
+    slots = []
+    last = 0
+    for m in SLOT_REGEX.finditer(html):
+        segments.append(html[last:m.start()].encode("utf-8"))
+        slots.append(m.group(1))
+        last = m.end()
+    segments.append(html[last:].encode("utf-8"))
+    return CompiledTemplate(tuple(segments), tuple(slots))
+
+
+def unsubscribe_url(base_url: str, email: str) -> str:
+    """Link handled by GET /unsubscribe?email= in newsletter_api."""
+    return f"{base_url.rstrip('/')}/unsubscribe?email={quote(email, safe='@')}"
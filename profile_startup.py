@@ -0,0 +1,86 @@
+"""
+Import-time report for the API service and pipeline scripts.
+
+    python profile_startup.py                          # newsletter_api.main
+    python profile_startup.py send_newsletter main -n 15
+    python profile_startup.py newsletter_api.main --max-ms 400   # exits 1 over budget (CI gate)
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULES = ["newsletter_api.main"]
+
+
+def _run(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+
+
+def measure_import_ms(module, runs=3):
+    """Best-of-N cold import time of `module` in a fresh interpreter, in milliseconds."""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    timings = []
+    for _ in range(runs):
+        result = _run(code)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()}")
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def import_report(module, top=10):
+    """Slowest imports by cumulative time, parsed from `python -X importtime`."""
+    result = _run(f"import {module}", "-X", "importtime")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        name = name[1:]  # keep the indentation, it encodes nesting depth
+        rows.append((int(cumulative_us), int(self_us), name))
+    # Only top-level entries (no indentation) add up to the real total
+    total_us = sum(r[0] for r in rows if not r[2].startswith(" "))
+    rows = sorted(((c, s, n.strip()) for c, s, n in rows), reverse=True)
+    return rows[:top], total_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cold-start import time.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("-n", "--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--max-ms", type=float, help="fail if any module imports slower than this")
+    args = parser.parse_args()
+
+    over_budget = False
+    for module in args.modules:
+        try:
+            elapsed = measure_import_ms(module)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            over_budget = True
+            continue
+
+        rows, total_us = import_report(module, args.top)
+        print(f"\n⏱️ import {module}: {elapsed:.1f} ms (importtime total {total_us / 1000:.1f} ms)")
+        print(f"   {'cumulative':>12} {'self':>10}  module")
+        for cumulative_us, self_us, name in rows:
+            print(f"   {cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+
+        if args.max_ms is not None and elapsed > args.max_ms:
+            print(f"❌ {module} exceeds the {args.max_ms:.0f} ms startup budget")
+            over_budget = True
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
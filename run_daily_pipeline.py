@@ -14,6 +14,7 @@ def main():
         ("Scrape Articles", "python main.py"),
         ("Generate Digests", "python generate_digests_groq.py"),
         ("Generate Newsletter", "python generate_newsletter_grok.py"),
+        ("Archive Run", "python -m newsletter_api.archive ingest"),
         ("Send Newsletter", "python send_newsletter.py"),
     ]
     for name, cmd in steps:
@@ -1,10 +1,7 @@
 # scrape_utils.py
 import requests
 from bs4 import BeautifulSoup
-from newspaper import Article
-from requests_html import HTMLSession
 import re
-from langdetect import detect
 from datetime import datetime, timezone
 
 # --------------------------- CLEANING ---------------------------
@@ -17,6 +14,8 @@ def clean_text(text):
 
 # --------------------------- RELEVANCE FILTER ---------------------------
 def is_relevant_article(title, summary):
+    from langdetect import detect
+
     text = f"{title} {summary}".lower()
     try:
         if detect(title) != "en":
@@ -102,6 +101,9 @@ def scrape_arxiv_official(limit=2):
 # --------------------------- FULL ARTICLE SCRAPER ---------------------------
 def scrape_article_full(url, max_words=200):
     """Fetch full article; handles dynamic pages with JS if needed."""
+    # Heavy scrapers are only imported when an article is actually fetched
+    from newspaper import Article
+
     try:
         # static scrape
         article = Article(url)
@@ -113,6 +115,7 @@ def scrape_article_full(url, max_words=200):
     except:
         try:
             # dynamic render
+            from requests_html import HTMLSession
             session = HTMLSession()
             r = session.get(url)
             r.html.render(timeout=20)
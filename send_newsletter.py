@@ -1,10 +1,14 @@
 import smtplib
 import os
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.image import MIMEImage
+import json
+import time
+import argparse
+from urllib.parse import urlsplit
+from multiprocessing import Pool
 from dotenv import load_dotenv
-from newsletter_api.database import get_all_subscribers
+from newsletter_api.database import get_all_subscribers, get_subscriber_id_bounds, iter_subscribers_in_range
+from newsletter_template import compile_template, unsubscribe_url
+from newsletter_mime import CampaignMessageBuilder
 
 load_dotenv()
 
@@ -12,52 +16,253 @@ SENDER_EMAIL = os.getenv("SENDER_EMAIL")
 SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "1") != "0"  # set to 0 for a local sink (python fake_smtp.py)
 HTML_PATH = "data/vector_daily.html"
 LOGO_PATH = "data/logo.png"
 SUBJECT = "📰 The Vector Daily - AI Newsletter"
+API_BASE_URL = os.getenv("API_BASE_URL")  # public URL of newsletter_api, used for unsubscribe links
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+REPORTS_DIR = "data/reports"
 
-def send_email(recipient_email):
+def load_template():
+    """Reads and compiles the newsletter HTML once per campaign."""
     if not os.path.exists(HTML_PATH):
         print(f"❌ Newsletter file not found at {HTML_PATH}")
-        return
+        return None
 
     with open(HTML_PATH, "r", encoding="utf-8") as f:
-        html_content = f.read()
+        return compile_template(f.read())
+
+def check_api_base_url():
+    """Unsubscribe links must reach a real API; a localhost link is only fine for a local sink."""
+    if not API_BASE_URL:
+        print("❌ API_BASE_URL is not set; refusing to send emails without a working unsubscribe link")
+        return False
+    if urlsplit(API_BASE_URL).hostname in LOCAL_HOSTS and SMTP_SERVER not in LOCAL_HOSTS:
+        print(f"❌ API_BASE_URL points at {API_BASE_URL} but mail goes to {SMTP_SERVER}; "
+              f"recipients couldn't unsubscribe")
+        return False
+    return True
 
-    msg = MIMEMultipart("related")
-    msg["From"] = SENDER_EMAIL
-    msg["To"] = recipient_email
-    msg["Subject"] = SUBJECT
+def load_builder():
+    """Compiles the template and encodes the constant MIME parts once per campaign."""
+    if not check_api_base_url():
+        return None
+    template = load_template()
+    if template is None:
+        return None
+    return CampaignMessageBuilder(template, SENDER_EMAIL, SUBJECT, LOGO_PATH)
 
-    alt = MIMEMultipart("alternative")
-    msg.attach(alt)
-    alt.attach(MIMEText(html_content, "html"))
+def connect_smtp():
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+    if SMTP_USE_TLS:
+        server.starttls()
+    if SENDER_PASSWORD:
+        server.login(SENDER_EMAIL, SENDER_PASSWORD)
+    return server
+
+def send_email(recipient_email, builder=None):
+    builder = builder or load_builder()
+    if builder is None:
+        return
 
-    if os.path.exists(LOGO_PATH):
-        with open(LOGO_PATH, "rb") as f:
-            logo = MIMEImage(f.read())
-            logo.add_header("Content-ID", "<logo>")
-            logo.add_header("Content-Disposition", "inline", filename="logo.jpg")
-            msg.attach(logo)
+    raw_message = builder.build(recipient_email, {
+        "unsubscribe_url": unsubscribe_url(API_BASE_URL, recipient_email),
+    })
 
     try:
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.send_message(msg)
+        with connect_smtp() as server:
+            server.sendmail(SENDER_EMAIL, [recipient_email], raw_message)
         print(f"✅ Sent newsletter to {recipient_email}")
     except Exception as e:
         print(f"❌ Failed to send to {recipient_email}: {e}")
 
+# ======================================================
+# SHARDED SEND
+# ======================================================
+def split_id_range(lo, hi, shards):
+    """Splits ids lo..hi (inclusive) into `shards` contiguous [start, end) ranges."""
+    step = -(-(hi - lo + 1) // shards)  # ceil division
+    return [(start, min(start + step, hi + 1)) for start in range(lo, hi + 1, step)]
+
+def _close_quietly(server):
+    if server is None:
+        return
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+def send_shard(start_id, end_id):
+    """
+    Worker: streams one id range and sends over a single reused SMTP connection.
+    Returns a shard report dict.
+    """
+    report = {"range": [start_id, end_id], "sent": 0, "failed": 0, "failures": [], "seconds": 0.0}
+    builder = load_builder()
+    if builder is None:
+        return report
+
+    started = time.perf_counter()
+    server = None
+    try:
+        for email in iter_subscribers_in_range(start_id, end_id):
+            raw_message = builder.build(email, {"unsubscribe_url": unsubscribe_url(API_BASE_URL, email)})
+            for attempt in range(2):
+                try:
+                    if server is None:
+                        server = connect_smtp()
+                    server.sendmail(SENDER_EMAIL, [email], raw_message)
+                    report["sent"] += 1
+                    break
+                except smtplib.SMTPServerDisconnected:
+                    # Connection dropped (idle timeout, per-connection limits): reconnect once
+                    server = None
+                    if attempt:
+                        report["failed"] += 1
+                        report["failures"].append({"email": email, "error": "server disconnected"})
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    # Rejected message, the connection itself is still fine
+                    report["failed"] += 1
+                    report["failures"].append({"email": email, "error": str(e)})
+                    break
+                except Exception as e:
+                    # Connection-level failure (OSError, TLS/auth errors...): reconnect for the next one
+                    _close_quietly(server)
+                    server = None
+                    report["failed"] += 1
+                    report["failures"].append({"email": email, "error": str(e)})
+                    break
+    finally:
+        _close_quietly(server)
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+def merge_reports(reports):
+    """Aggregates shard reports into one campaign report."""
+    campaign = {"shards": len(reports), "sent": 0, "failed": 0, "failures": [], "seconds": 0.0}
+    for r in reports:
+        campaign["sent"] += r["sent"]
+        campaign["failed"] += r["failed"]
+        campaign["failures"].extend(r["failures"])
+        campaign["seconds"] = max(campaign["seconds"], r["seconds"])
+    return campaign
+
+def shard_ranges(shards, bounds=None):
+    """Id ranges for `shards` workers; `bounds` (lo, hi) pins the id space, else it is read from the DB."""
+    bounds = bounds or get_subscriber_id_bounds()
+    if bounds is None:
+        return []
+    return split_id_range(bounds[0], bounds[1], shards)
+
+def send_sharded(workers):
+    """Coordinator: one process per id range on this host, then a single campaign report."""
+    ranges = shard_ranges(workers)
+    if not ranges:
+        print("⚠️ No subscribers found in database.")
+        return None
+
+    print(f"📬 Sending newsletter with {len(ranges)} workers...")
+    started = time.perf_counter()
+    with Pool(processes=len(ranges)) as pool:
+        reports = pool.starmap(send_shard, ranges)
+    campaign = merge_reports(reports)
+    campaign["seconds"] = round(time.perf_counter() - started, 3)
+    return campaign
+
+def send_one_shard(index, total, bounds):
+    """
+    For multi-host runs: send shard `index` of `total` and save its report for --merge.
+    Every host must get the same `bounds` (from --plan) so ranges can't drift as people subscribe.
+    """
+    ranges = shard_ranges(total, bounds)
+    if index < len(ranges):
+        report = send_shard(*ranges[index])
+    else:
+        # Fewer ids than shards: record an empty shard so --merge can tell it apart from a missing one
+        report = {"range": None, "sent": 0, "failed": 0, "failures": [], "seconds": 0.0}
+        print(f"⚠️ Shard {index}/{total} has no ids to send")
+    report["shard"] = f"{index}/{total}"
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, f"shard-{index}-of-{total}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"🗂️ Shard report saved to {path}")
+    return report
+
+def print_plan(total):
+    """Snapshots the id bounds once and prints the command for each host."""
+    bounds = get_subscriber_id_bounds()
+    if bounds is None:
+        print("⚠️ No subscribers found in database.")
+        return
+    lo, hi = bounds
+    print(f"🗺️ Subscriber ids {lo}..{hi} in {total} shards. Run on each host:")
+    for index in range(total):
+        print(f"   python send_newsletter.py --shard {index}/{total} --bounds {lo}:{hi}")
+
+def print_report(campaign):
+    print(f"✅ Sent {campaign['sent']} • ❌ Failed {campaign['failed']} • ⏱️ {campaign['seconds']}s")
+    for failure in campaign["failures"][:20]:
+        print(f"   ❌ {failure['email']}: {failure['error']}")
+
 def main():
     subscribers = get_all_subscribers()
     if not subscribers:
         print("⚠️ No subscribers found in database.")
         return
 
+    builder = load_builder()
+    if builder is None:
+        return
+
     print(f"📬 Sending newsletter to {len(subscribers)} subscribers...")
     for email in subscribers:
-        send_email(email)
+        send_email(email, builder)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Send The Vector Daily newsletter.")
+    parser.add_argument("--workers", type=int, help="send in parallel, one process per subscriber id range")
+    parser.add_argument("--plan", type=int, metavar="N", help="print --shard commands for N hosts with fixed id bounds")
+    parser.add_argument("--shard", help="send only shard K/N (0-based), e.g. --shard 2/8 on the third host")
+    parser.add_argument("--bounds", help="id bounds LO:HI from --plan (required with --shard)")
+    parser.add_argument("--merge", nargs="+", metavar="REPORT", help="combine shard report files into one")
+    args = parser.parse_args()
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.plan is not None and args.plan < 1:
+        parser.error("--plan needs at least 1 host")
+    if args.bounds and not args.shard:
+        parser.error("--bounds only applies with --shard")
+
+    if args.merge:
+        reports = []
+        for path in args.merge:
+            with open(path, "r", encoding="utf-8") as f:
+                reports.append(json.load(f))
+        print_report(merge_reports(reports))
+    elif args.plan is not None:
+        print_plan(args.plan)
+    elif args.shard:
+        if not args.bounds:
+            parser.error("--shard needs --bounds LO:HI (get it from --plan) so all hosts split the same ids")
+        try:
+            index, total = (int(x) for x in args.shard.split("/"))
+        except ValueError:
+            parser.error(f"--shard must look like K/N, got {args.shard!r}")
+        if total < 1 or not 0 <= index < total:
+            parser.error(f"--shard K/N needs N >= 1 and 0 <= K < N, got {args.shard}")
+        try:
+            lo, hi = (int(x) for x in args.bounds.split(":"))
+        except ValueError:
+            parser.error(f"--bounds must look like LO:HI, got {args.bounds!r}")
+        if lo > hi:
+            parser.error(f"--bounds LO:HI needs LO <= HI, got {args.bounds}")
+        print_report(merge_reports([send_one_shard(index, total, (lo, hi))]))
+    elif args.workers is not None:
+        campaign = send_sharded(args.workers)
+        if campaign:
+            print_report(campaign)
+    else:
+        main()
@@ -0,0 +1,170 @@
+import json
+import os
+import sys
+from itertools import islice
+
+# ---------------- CONFIG ----------------
+# Format used when the pipeline writes intermediates (data/ai_news, data/ai_news_digest).
+# "json" keeps the original indent=2 files; "jsonl" streams one record per line;
+# "parquet" is columnar (needs pyarrow, which pandas uses for Parquet anyway).
+INTERMEDIATE_FORMAT = os.getenv("INTERMEDIATE_FORMAT", "json")
+EXTENSIONS = {"json": ".json", "jsonl": ".jsonl", "ndjson": ".jsonl", "parquet": ".parquet"}
+BATCH_SIZE = 10_000
+
+
+def _format_of(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext == ".parquet":
+        return "parquet"
+    if ext == ".json":
+        return "json"
+    raise ValueError(f"Unsupported intermediate file type: {path}")
+
+
+def _batches(records, size=BATCH_SIZE):
+    it = iter(records)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _union_keys(batch):
+    """Every key seen in the batch, in first-seen order."""
+    keys = {}
+    for r in batch:
+        keys.update(dict.fromkeys(r))
+    return list(keys)
+
+
+# --------------------------- PATHS ---------------------------
+def intermediate_path(stem, fmt=None):
+    """Path to write an intermediate to, e.g. intermediate_path("data/ai_news") -> data/ai_news.parquet."""
+    return stem + EXTENSIONS[fmt or INTERMEDIATE_FORMAT]
+
+
+def find_intermediate(stem):
+    """The most recently written existing variant of an intermediate (any format), or None."""
+    candidates = [stem + ext for ext in set(EXTENSIONS.values()) if os.path.exists(stem + ext)]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+# --------------------------- WRITE ---------------------------
+def write_records(path, records):
+    """
+    Writes an iterable of dicts. jsonl and parquet are written in batches, never all in memory.
+    Output goes to a .tmp file that replaces `path` only once complete, so readers
+    (find_intermediate picks the newest file) never see a half-written intermediate.
+    """
+    fmt = _format_of(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    try:
+        _write(fmt, tmp_path, records)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+
+def _write(fmt, path, records):
+    if fmt == "json":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(list(records), f, ensure_ascii=False, indent=2)
+
+    elif fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(r, ensure_ascii=False))
+                f.write("\n")
+
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for batch in _batches(records):
+                keys = _union_keys(batch)
+                if writer is None:
+                    # Union of keys across the batch: from_pylist alone only looks at the first row
+                    table = pa.Table.from_pylist([{k: r.get(k) for k in keys} for r in batch])
+                    # All-null columns in the first batch would lock the schema to "null"
+                    schema = pa.schema([
+                        f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema
+                    ])
+                    writer = pq.ParquetWriter(path, schema, compression="zstd")
+                unknown = [k for k in keys if k not in schema.names]
+                if unknown:
+                    raise ValueError(
+                        f"Records gained new fields {unknown} after the Parquet schema was fixed; "
+                        f"write {path} as .jsonl or add the fields to every record"
+                    )
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            pq.write_table(pa.table({}), path)
+
+
+# --------------------------- READ ---------------------------
+def iter_records(path):
+    """Streams dicts from any supported format without loading the whole file (except legacy .json)."""
+    fmt = _format_of(path)
+    if fmt == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+
+    elif fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    else:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=BATCH_SIZE):
+            yield from batch.to_pylist()
+
+
+def read_records(path):
+    return list(iter_records(path))
+
+
+def read_columns(path, columns=None):
+    """
+    Loads only the requested columns into a pandas DataFrame.
+    Parquet files are memory-mapped and other columns are never decoded.
+    """
+    import pandas as pd
+
+    if _format_of(path) == "parquet":
+        return pd.read_parquet(path, columns=columns, engine="pyarrow", memory_map=True)
+
+    if columns is None:
+        return pd.DataFrame.from_records(iter_records(path))
+    return pd.DataFrame.from_records(
+        ({c: r.get(c) for c in columns} for r in iter_records(path)), columns=columns
+    )
+
+
+# --------------------------- CONVERT ---------------------------
+def convert(src, dst):
+    """Re-encodes an intermediate between formats, streaming where the formats allow."""
+    write_records(dst, iter_records(src))
+
+
+if __name__ == "__main__":
+    # python storage.py convert data/ai_news.json data/ai_news.parquet
+    if len(sys.argv) != 4 or sys.argv[1] != "convert":
+        print("Usage: python storage.py convert <src.json|.jsonl|.parquet> <dst.json|.jsonl|.parquet>")
+        sys.exit(1)
+    convert(sys.argv[2], sys.argv[3])
+    print(f"✅ Converted {sys.argv[2]} → {sys.argv[3]}")
@@ -0,0 +1,45 @@
+"""
+Cold-start regression checks for the API and the sender.
+
+    python -m pytest tests/test_startup.py
+    API_STARTUP_BUDGET_MS=300 python -m pytest tests/test_startup.py
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from profile_startup import measure_import_ms  # noqa: E402
+
+pytest.importorskip("fastapi")
+pytest.importorskip("dotenv")
+
+API_STARTUP_BUDGET_MS = float(os.getenv("API_STARTUP_BUDGET_MS", 500))
+
+# Heavy dependencies that must only load when a code path actually needs them
+LAZY_MODULES = ["psycopg2", "groq", "newspaper", "requests_html", "langdetect"]
+
+
+def test_api_import_within_budget():
+    elapsed = measure_import_ms("newsletter_api.main")
+    assert elapsed <= API_STARTUP_BUDGET_MS, (
+        f"import newsletter_api.main took {elapsed:.1f} ms (budget {API_STARTUP_BUDGET_MS:.0f} ms); "
+        f"see python profile_startup.py newsletter_api.main"
+    )
+
+
+@pytest.mark.parametrize("module", ["newsletter_api.main", "send_newsletter"])
+def test_heavy_dependencies_stay_lazy(module):
+    code = (
+        "import sys; "
+        f"import {module}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    loaded = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    assert not loaded, f"import {module} eagerly loads {loaded}"